@@ -0,0 +1,156 @@
+"""
+Serving-cost benchmark of each filter/ranking DSL combo against Elasticsearch.
+
+Replays the keyword set for every combo through SearchClient.benchmark and
+reports ES `took` and client latency percentiles next to the relevance
+metrics of the latest evaluation run of the same combo in results/.
+
+    python benchmarks/bench_dsl_serving.py --keywords-file keywords/sample_keyword.csv
+    python benchmarks/bench_dsl_serving.py --keywords-file keywords/sample_keyword.csv \
+        --es-url http://localhost:9200 --dsl-params-file results/serving_benchmark/dsl_params.json --profile
+
+A run that fetches DSL parameters from the feature platform writes them to
+dsl_params.json in the output directory; --dsl-params-file replays them, so a
+local ES or stand-in gets the same terms lists and ranking functions offline.
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pandas as pd  # noqa: E402
+
+from config import SearchConfig, DSL_COMBOS  # noqa: E402
+from main import create_search_client, load_keywords, parse_combo  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+
+def save_dsl_params(dsl_params: dict, path: str):
+    with open(path, "w") as f:
+        json.dump(dsl_params, f, indent=2, ensure_ascii=False)
+
+
+def load_dsl_params(path: str) -> dict:
+    """Load DSL parameters saved by save_dsl_params, restoring numeric category ids"""
+    with open(path) as f:
+        dsl_params = json.load(f)
+    for params in dsl_params.values():
+        for depth in (1, 2, 3):
+            weights = params[f"category_{depth}_weights"]
+            params[f"category_{depth}_weights"] = {
+                int(k) if k.lstrip("-").isdigit() else k: v for k, v in weights.items()
+            }
+    return dsl_params
+
+
+def load_relevance_metrics(results_dir: str, dsl_filter: str, dsl_ranking: str) -> dict:
+    """Load metrics of the latest evaluation run of a combo, if any"""
+    run_dirs = sorted(glob.glob(os.path.join(results_dir, f"{dsl_filter}_{dsl_ranking}_*")))
+    for run_dir in reversed(run_dirs):
+        metrics_path = os.path.join(run_dir, "metrics.json")
+        if os.path.exists(metrics_path):
+            with open(metrics_path) as f:
+                metrics = json.load(f)[0]
+            return {
+                "avg_precision": metrics.get("avg_precision"),
+                "avg_ndcg": metrics.get("avg_ndcg"),
+                "relevance_run": os.path.basename(run_dir),
+            }
+    return {}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark serving cost of DSL combos")
+    parser.add_argument("--keywords-file", type=str, required=True, help="Path to CSV file containing keywords")
+    parser.add_argument(
+        "--combos",
+        type=parse_combo,
+        nargs="*",
+        help="Combos as filter:ranking (default: all evaluated combos)",
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel requests")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed passes per combo")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes per combo")
+    parser.add_argument("--profile", action="store_true", help="Add an untimed profiled pass and save per-clause breakdowns")
+    parser.add_argument("--es-url", type=str, default=None, help="Override ES URL (e.g. local ES)")
+    parser.add_argument("--es-index", type=str, default=None, help="Override ES index")
+    parser.add_argument(
+        "--dsl-params-file",
+        type=str,
+        default=None,
+        help="Replay DSL parameters saved by a previous run instead of calling the feature platform",
+    )
+    parser.add_argument("--results-dir", type=str, default="results", help="Evaluation results to join")
+    parser.add_argument("--output-dir", type=str, default="results/serving_benchmark", help="Report directory")
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s: %(message)s")
+    args = parse_args()
+    config = SearchConfig()
+
+    keywords = load_keywords(args.keywords_file)["keyword"].tolist()
+    config.ES_URL = args.es_url or config.ES_URL
+    config.ES_INDEX = args.es_index or config.ES_INDEX
+    search_client = create_search_client(config)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # DSL parameters do not depend on the combo, fetch them once per keyword
+    if args.dsl_params_file:
+        dsl_params = load_dsl_params(args.dsl_params_file)
+        missing = [keyword for keyword in keywords if keyword not in dsl_params]
+        if missing:
+            raise ValueError(f"No DSL parameters for keywords in {args.dsl_params_file}: {missing}")
+    else:
+        dsl_params = {keyword: search_client.get_dsl_params(keyword) for keyword in keywords}
+        save_dsl_params(dsl_params, os.path.join(args.output_dir, "dsl_params.json"))
+
+    rows, profiles = [], {}
+    for dsl_filter, dsl_ranking in args.combos or DSL_COMBOS:
+        logger.info(f"Benchmarking filter {dsl_filter}, ranking {dsl_ranking}")
+        report = search_client.benchmark(
+            keywords=keywords,
+            dsl_filter=dsl_filter,
+            dsl_ranking=dsl_ranking,
+            concurrency=args.concurrency,
+            warmup=args.warmup,
+            repeat=args.repeat,
+            profile=args.profile,
+            dsl_params=dsl_params,
+        )
+        profile = report.pop("profile_ms", None)
+        if profile is not None:
+            profiles[f"{dsl_filter}_{dsl_ranking}"] = profile
+        report.update(load_relevance_metrics(args.results_dir, dsl_filter, dsl_ranking))
+        rows.append(report)
+
+    df_report = pd.DataFrame(rows)
+    df_report.to_csv(os.path.join(args.output_dir, "serving_benchmark.csv"), index=False)
+    if profiles:
+        with open(os.path.join(args.output_dir, "profile_breakdown.json"), "w") as f:
+            json.dump(profiles, f, indent=2, ensure_ascii=False)
+
+    columns = [
+        "dsl_filter",
+        "dsl_ranking",
+        "avg_filter_terms",
+        "avg_ranking_functions",
+        "took_p50_ms",
+        "took_p99_ms",
+        "latency_p50_ms",
+        "latency_p99_ms",
+    ]
+    columns += [col for col in ("avg_precision", "avg_ndcg") if col in df_report.columns]
+    print(df_report[columns].to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    logger.info(f"Report saved to: {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
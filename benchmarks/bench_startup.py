@@ -0,0 +1,104 @@
+"""
+Startup-time benchmark for the evaluation CLI.
+
+Measures the wall time of fresh interpreter runs (CLI --help, importing each
+pipeline module) and the in-process cost of building a SearchClient together
+with its feature platform client from the on-disk descriptor cache.
+
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from config import SearchConfig  # noqa: E402
+from search.feature_platform import descriptor_cache_path  # noqa: E402
+
+SUBPROCESS_CASES = {
+    "interpreter": "pass",
+    "import main": "import main",
+    "main.py --help": None,
+    "import search.client": "import search.client",
+    "import evaluator.llm_evaluator": "import evaluator.llm_evaluator",
+    "import utils.data_processor": "import utils.data_processor",
+}
+
+
+def time_subprocess(code, repeat: int) -> list:
+    if code is None:
+        cmd = [sys.executable, "main.py", "--help"]
+    else:
+        cmd = [sys.executable, "-c", code]
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(cmd, cwd=ROOT, capture_output=True)
+        elapsed = time.perf_counter() - start
+        if proc.returncode != 0:
+            return []
+        timings.append(elapsed)
+    return timings
+
+
+def time_client_construction(config: SearchConfig, repeat: int) -> list:
+    from search.client import SearchClient
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        client = SearchClient(
+            es_url=config.ES_URL,
+            es_index=config.ES_INDEX,
+            feature_platform_config={
+                "endpoint": config.FEATURE_PLATFORM_ENDPOINT,
+                "service": config.FEATURE_PLATFORM_SERVICE,
+                "method": config.FEATURE_PLATFORM_METHOD,
+                "descriptor_cache_dir": config.FEATURE_PLATFORM_DESCRIPTOR_CACHE_DIR,
+            },
+        )
+        client.fp_client
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def report(name: str, timings: list):
+    if not timings:
+        print(f"{name:<40} {'failed':>10}")
+        return
+    print(
+        f"{name:<40} {statistics.median(timings) * 1000:>8.1f}ms"
+        f" {min(timings) * 1000:>8.1f}ms {max(timings) * 1000:>8.1f}ms"
+    )
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup time")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per case")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    config = SearchConfig()
+
+    print(f"{'case':<40} {'median':>10} {'min':>10} {'max':>10}")
+    for name, code in SUBPROCESS_CASES.items():
+        report(name, time_subprocess(code, args.repeat))
+
+    cache_dir = os.path.join(ROOT, config.FEATURE_PLATFORM_DESCRIPTOR_CACHE_DIR)
+    cache_path = descriptor_cache_path(cache_dir, config.FEATURE_PLATFORM_ENDPOINT, config.FEATURE_PLATFORM_SERVICE)
+    if os.path.exists(cache_path):
+        config.FEATURE_PLATFORM_DESCRIPTOR_CACHE_DIR = cache_dir
+        report("SearchClient + cached descriptors", time_client_construction(config, args.repeat))
+    else:
+        print(f"Descriptor cache not found at {cache_path}; run an evaluation once to create it")
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,26 @@
 from dataclasses import dataclass
+from typing import Optional
 import os
 
+DSL_FILTERS = ["fasttext", "llm_depth1", "llm_depth2", "llm_depth3"]
+DSL_RANKINGS = [
+    "fasttext",
+    "llm_depth123_score123",
+    "llm_depth123_score12",
+    "llm_depth23_score123",
+    "llm_depth23_score12",
+    "llm_depth3_score123",
+    "llm_depth3_score12",
+]
+# Filter/ranking combos that are evaluated (see run.sh)
+DSL_COMBOS = [("fasttext", "fasttext")] + [
+    (dsl_filter, dsl_ranking)
+    for dsl_filter in DSL_FILTERS
+    if dsl_filter != "fasttext"
+    for dsl_ranking in DSL_RANKINGS
+    if dsl_ranking != "fasttext"
+]
+
 
 @dataclass
 class SearchConfig:
@@ -14,6 +34,8 @@ class SearchConfig:
 
     # Paths
     PROMPT_TEMPLATE_PATH: str = "prompts/v1.txt"
+    STRUCTURED_PROMPT_TEMPLATE_PATH: str = "prompts/v1_structured.txt"
+    LABEL_PROMPT_TEMPLATE_PATH: str = "prompts/v1_label.txt"
 
     # Feature platform settings
     FEATURE_PLATFORM_ENDPOINT: str = "feature-platform-grpc.kr.krmt.io:80"
@@ -21,7 +43,22 @@ class SearchConfig:
         "featureplatform.featureserving.rpc.v1.FeatureServingService"
     )
     FEATURE_PLATFORM_METHOD: str = "GetSearchKeywordViewEntity"
+    FEATURE_PLATFORM_DESCRIPTOR_CACHE_DIR: str = ".cache/feature_platform"
+    FEATURE_PLATFORM_REFRESH_DESCRIPTORS: bool = False
 
     # LLM settings
     NUM_LLM_REQUESTS: int = 100
     NUM_WORKERS: int = 16
+    LLM_RESPONSE_MODE: str = "structured"  # free, structured or label
+    LLM_LABEL_MAX_TOKENS: int = 10
+
+    # Run planning and budget settings
+    LLM_AVG_LATENCY_S: float = 1.5
+    LLM_BUDGET_USD: Optional[float] = None
+    MIN_RANKS_PER_KEYWORD: int = 20
+    PLAN_SAMPLE_KEYWORDS: int = 5
+
+    # Top-K overlap settings
+    OVERLAP_RBO_P: float = 0.98
+    OVERLAP_THRESHOLD: float = 0.9
+    OVERLAP_MIN_KEYWORDS: int = 5
@@ -0,0 +1,271 @@
+import math
+import threading
+import logging
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M tokens: (input, output)
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+# Typical completion tokens per call for each LLM response mode
+EXPECTED_COMPLETION_TOKENS = {"free": 60, "structured": 50, "label": 6}
+
+
+class BudgetExceededError(Exception):
+    """Raised when the LLM budget of a run has been spent"""
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Count prompt tokens locally with tiktoken, or approximate from UTF-8 length"""
+    try:
+        import tiktoken
+    except ImportError:
+        # Roughly 4 bytes per token; Hangul is 3 bytes per syllable
+        return math.ceil(len(text.encode("utf-8")) / 4)
+
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("o200k_base")
+    return len(encoding.encode(text))
+
+
+_unpriced_models = set()
+
+
+def require_pricing(model: str) -> None:
+    """Raise if `model` has no pricing, e.g. before enforcing a budget"""
+    if model not in MODEL_PRICING:
+        raise ValueError(f"No pricing for model {model}, add it to MODEL_PRICING to set a budget")
+
+
+def estimate_cost(prompt_tokens: float, completion_tokens: float, model: str) -> float:
+    """Cost in USD of the given token counts, NaN for models without pricing"""
+    if model not in MODEL_PRICING:
+        if model not in _unpriced_models:
+            _unpriced_models.add(model)
+            logger.warning(f"No pricing for model {model}, costs are reported as NaN")
+        return math.nan
+    input_price, output_price = MODEL_PRICING[model]
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1e6
+
+
+class UsageTracker:
+    """
+    Accumulate actual LLM usage per combo and keyword and enforce a budget.
+
+    Shared by the evaluator worker threads. With a budget, each call first
+    reserves its projected cost; the reservation is refused with
+    BudgetExceededError if spent plus in-flight cost would pass `budget_usd`,
+    and is settled with the actual usage once the call returns.
+    """
+
+    def __init__(self, model: str, combo: str, budget_usd: Optional[float] = None):
+        if budget_usd is not None:
+            require_pricing(model)
+
+        self.model = model
+        self.combo = combo
+        self.budget_usd = budget_usd
+        self.usage = {}
+        self.refused_calls = 0
+        self._reserved = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def total_cost(self) -> float:
+        with self._lock:
+            return sum(u["cost_usd"] for u in self.usage.values())
+
+    @property
+    def exhausted(self) -> bool:
+        if self.budget_usd is None:
+            return False
+        return self.refused_calls > 0 or self.total_cost >= self.budget_usd
+
+    def reserve(self, prompt_tokens: int, completion_tokens: int) -> float:
+        """
+        Reserve the projected cost of a call before making it
+
+        Returns:
+            The reserved cost, to be passed to `settle` or `release`
+        """
+        if self.budget_usd is None:
+            return 0.0
+
+        cost = estimate_cost(prompt_tokens, completion_tokens, self.model)
+        with self._lock:
+            spent = sum(u["cost_usd"] for u in self.usage.values())
+            if spent + self._reserved + cost > self.budget_usd:
+                self.refused_calls += 1
+                raise BudgetExceededError(f"LLM budget of ${self.budget_usd:.2f} spent")
+            self._reserved += cost
+        return cost
+
+    def release(self, reserved_cost: float) -> None:
+        """Release a reservation whose call did not complete"""
+        with self._lock:
+            self._reserved -= reserved_cost
+
+    def settle(self, reserved_cost: float, keyword: str, prompt_tokens: int, completion_tokens: int) -> None:
+        """Replace a reservation with the actual usage of the call"""
+        self.release(reserved_cost)
+        self.record(keyword, prompt_tokens, completion_tokens)
+
+    def record(self, keyword: str, prompt_tokens: int, completion_tokens: int) -> None:
+        cost = estimate_cost(prompt_tokens or 0, completion_tokens or 0, self.model)
+        with self._lock:
+            usage = self.usage.setdefault(
+                keyword,
+                {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0},
+            )
+            usage["calls"] += 1
+            usage["prompt_tokens"] += prompt_tokens or 0
+            usage["completion_tokens"] += completion_tokens or 0
+            usage["cost_usd"] += cost
+
+    def to_frame(self) -> pd.DataFrame:
+        """Usage per keyword, with the combo as a column"""
+        with self._lock:
+            rows = [{"combo": self.combo, "keyword": k, **u} for k, u in self.usage.items()]
+        return pd.DataFrame(
+            rows, columns=["combo", "keyword", "calls", "prompt_tokens", "completion_tokens", "cost_usd"]
+        )
+
+    def summary(self) -> Dict[str, float]:
+        df = self.to_frame()
+        return {
+            "llm_calls": df["calls"].sum(),
+            "llm_prompt_tokens": df["prompt_tokens"].sum(),
+            "llm_completion_tokens": df["completion_tokens"].sum(),
+            "llm_cost_usd": df["cost_usd"].sum(skipna=False),
+        }
+
+
+def expected_completion_tokens(response_mode: str, max_tokens: Optional[int] = None) -> int:
+    """Typical completion tokens per call, capped by `max_tokens`"""
+    tokens = EXPECTED_COMPLETION_TOKENS[response_mode]
+    return min(tokens, max_tokens) if max_tokens is not None else tokens
+
+
+def plan_run(
+    prompts: List[str],
+    num_keywords: int,
+    ranks_per_keyword: float,
+    model: str,
+    response_mode: str,
+    max_workers: int,
+    avg_latency_s: float,
+    num_combos: int = 1,
+    max_tokens: Optional[int] = None,
+    keyword_overhead_s: float = 1.0,
+) -> Dict[str, float]:
+    """
+    Project calls, tokens, cost and wall time of a run
+
+    Args:
+        prompts: rendered prompts for the planned (keyword, ad) pairs or a sample of them
+        num_keywords: number of keywords to judge per combo
+        ranks_per_keyword: expected number of judged ads per keyword
+        model: OpenAI model name, used for tokenization and pricing
+        response_mode: LLM response mode, used for expected completion tokens
+        max_workers: concurrent LLM calls per keyword
+        avg_latency_s: average latency of one LLM call
+        num_combos: number of DSL combos in the sweep
+        max_tokens: completion token cap, if any
+        keyword_overhead_s: fixed time per keyword (search and pacing)
+    Returns:
+        Dictionary with projected calls, tokens, cost (USD) and wall time (s)
+    """
+    prompt_tokens_per_call = sum(count_tokens(p, model) for p in prompts) / len(prompts) if prompts else 0
+    completion_tokens_per_call = expected_completion_tokens(response_mode, max_tokens)
+
+    calls = num_keywords * ranks_per_keyword * num_combos
+    prompt_tokens = calls * prompt_tokens_per_call
+    completion_tokens = calls * completion_tokens_per_call
+    rounds_per_keyword = math.ceil(ranks_per_keyword / max_workers) if ranks_per_keyword else 0
+    wall_time_s = num_keywords * num_combos * (rounds_per_keyword * avg_latency_s + keyword_overhead_s)
+
+    return {
+        "num_keywords": num_keywords,
+        "ranks_per_keyword": ranks_per_keyword,
+        "num_combos": num_combos,
+        "calls": calls,
+        "prompt_tokens_per_call": prompt_tokens_per_call,
+        "completion_tokens_per_call": completion_tokens_per_call,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cost_usd": estimate_cost(prompt_tokens, completion_tokens, model),
+        "wall_time_s": wall_time_s,
+    }
+
+
+def allocate_budget(
+    budget_usd: float,
+    cost_per_call: float,
+    num_keywords: int,
+    max_ranks: int,
+    min_ranks: int,
+    num_combos: int = 1,
+) -> Dict[str, int]:
+    """
+    Choose how many keywords and ranks per keyword to judge within a budget
+
+    Keyword-averaged metrics vary far more across keywords than across ranks,
+    so keywords are kept and ranks per keyword reduced down to `min_ranks`
+    before any keyword is dropped.
+
+    Returns:
+        Dictionary with num_keywords and ranks_per_keyword
+    """
+    min_ranks = min(min_ranks, max_ranks)
+    affordable_calls = int(budget_usd / cost_per_call) // num_combos if cost_per_call > 0 else math.inf
+
+    if affordable_calls >= num_keywords * max_ranks:
+        return {"num_keywords": num_keywords, "ranks_per_keyword": max_ranks}
+
+    ranks = affordable_calls // num_keywords
+    if ranks >= min_ranks:
+        return {"num_keywords": num_keywords, "ranks_per_keyword": ranks}
+
+    return {"num_keywords": affordable_calls // min_ranks, "ranks_per_keyword": min_ranks}
+
+
+def allocate_union_budget(
+    budget_usd: float,
+    cost_per_call: float,
+    first_ranks: List[List[int]],
+    max_ranks: int,
+    min_ranks: int,
+) -> Dict[str, int]:
+    """
+    Choose how many keywords and ranks per combo to judge within a budget
+    when the union of the combos' top ranks is judged once per keyword
+
+    As in allocate_budget, ranks are reduced down to `min_ranks` before any
+    keyword is dropped. A keyword costs one call per distinct ad that any
+    combo ranks within the judged depth.
+
+    Args:
+        first_ranks: per keyword, the best rank of each distinct ad across combos
+    Returns:
+        Dictionary with num_keywords and ranks_per_keyword
+    """
+    min_ranks = min(min_ranks, max_ranks)
+    affordable_calls = budget_usd / cost_per_call if cost_per_call > 0 else math.inf
+
+    for ranks in range(max_ranks, min_ranks - 1, -1):
+        calls = sum(1 for keyword_ranks in first_ranks for rank in keyword_ranks if rank <= ranks)
+        if calls <= affordable_calls:
+            return {"num_keywords": len(first_ranks), "ranks_per_keyword": ranks}
+
+    calls_per_keyword = calls / len(first_ranks)
+    return {"num_keywords": int(affordable_calls // calls_per_keyword), "ranks_per_keyword": min_ranks}
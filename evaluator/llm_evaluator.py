@@ -1,13 +1,131 @@
 import pandas as pd
-from typing import Dict
+from typing import Dict, Optional
 import json
+import re
+import time
 from openai import OpenAI
 from jinja2 import Template
 import logging
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from evaluator.cost import BudgetExceededError, UsageTracker, count_tokens, expected_completion_tokens
+
 logger = logging.getLogger(__name__)
 
+# Response modes
+# - free: model free-writes the JSON described in the prompt
+# - structured: JSON schema response format with all fields
+# - label: JSON schema with only the score, capped output tokens
+RESPONSE_MODES = ("free", "structured", "label")
+
+FULL_RESPONSE_SCHEMA = {
+    "name": "relevance_judgement",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "Query": {"type": "string"},
+            "Core_intent": {"type": "string"},
+            "Ads_core_intent": {"type": "string"},
+            "Score": {"type": "integer", "enum": [0, 1]},
+        },
+        "required": ["Query", "Core_intent", "Ads_core_intent", "Score"],
+        "additionalProperties": False,
+    },
+}
+
+LABEL_RESPONSE_SCHEMA = {
+    "name": "relevance_label",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "Score": {"type": "integer", "enum": [0, 1]},
+        },
+        "required": ["Score"],
+        "additionalProperties": False,
+    },
+}
+
+
+RESULT_COLUMNS = [
+    "label",
+    "core_intent",
+    "ads_core_intent",
+    "prompt_tokens",
+    "completion_tokens",
+    "latency_ms",
+    "parse_failed",
+    "product_id",
+]
+
+
+def load_prompt_template(prompt_template_path: str) -> Template:
+    with open(prompt_template_path, "r") as f:
+        return Template(f.read())
+
+
+def render_prompt(template: Template, row: Dict) -> str:
+    """Render the judge prompt for a single search result"""
+    return template.render(
+        {
+            "query": row["keyword"],
+            "query_category": row.get("top_category_name", ""),
+            "title": row["title"],
+            "category": row["category"],
+        }
+    )
+
+
+def parse_llm_response(content: str) -> Dict:
+    """
+    Parse the judge response into a dict, tolerating markdown fences,
+    surrounding text and truncated JSON. `Score` is returned as an int.
+
+    Raises:
+        ValueError: if no score can be recovered or it is not 0 or 1
+    """
+    result = _extract_response(content)
+    score = result["Score"]
+    if isinstance(score, bool) or str(score).strip() not in ("0", "1"):
+        raise ValueError(f"Invalid score {score!r} in LLM response: {content!r}")
+    result["Score"] = int(str(score).strip())
+    return result
+
+
+def _extract_response(content: str) -> Dict:
+    text = (content or "").strip()
+    text = re.sub(r"^```(?:json)?\s*|\s*```$", "", text).strip()
+
+    try:
+        result = json.loads(text)
+        if isinstance(result, dict) and "Score" in result:
+            return result
+    except json.JSONDecodeError:
+        pass
+
+    start = text.find("{")
+    end = text.rfind("}")
+    if start != -1 and end > start:
+        try:
+            result = json.loads(text[start : end + 1])
+            if isinstance(result, dict) and "Score" in result:
+                return result
+        except json.JSONDecodeError:
+            pass
+
+    # Partial JSON: recover individual fields
+    score = re.search(r'"Score"\s*:\s*"?\s*(\d+)', text)
+    if score is None:
+        raise ValueError(f"Could not parse LLM response: {content!r}")
+
+    result = {"Score": score.group(1)}
+    for field in ("Query", "Core_intent", "Ads_core_intent"):
+        match = re.search(rf'"{field}"\s*:\s*"([^"]*)"', text)
+        if match:
+            result[field] = match.group(1)
+    return result
+
 
 class LLMEvaluator:
     def __init__(
@@ -17,47 +135,103 @@ class LLMEvaluator:
         prompt_template_path: str,
         num_requests: int = 10,
         max_workers: int = 4,
+        response_mode: str = "free",
+        max_tokens: Optional[int] = None,
+        usage_tracker: Optional[UsageTracker] = None,
     ):
+        if response_mode not in RESPONSE_MODES:
+            raise ValueError(f"Unsupported response mode: {response_mode}")
+
         self.client = OpenAI(api_key=api_key)
         self.model_name = model_name
         self.num_requests = num_requests
         self.max_workers = max_workers
+        self.response_mode = response_mode
+        self.max_tokens = max_tokens
+        self.usage_tracker = usage_tracker
 
         # Load prompt template
-        with open(prompt_template_path, "r") as f:
-            self.template = Template(f.read())
+        self.template = load_prompt_template(prompt_template_path)
+
+    def _completion_kwargs(self) -> Dict:
+        kwargs = {}
+        if self.response_mode == "structured":
+            kwargs["response_format"] = {"type": "json_schema", "json_schema": FULL_RESPONSE_SCHEMA}
+        elif self.response_mode == "label":
+            kwargs["response_format"] = {"type": "json_schema", "json_schema": LABEL_RESPONSE_SCHEMA}
+        if self.max_tokens is not None:
+            kwargs["max_tokens"] = self.max_tokens
+        return kwargs
 
     def evaluate_single(self, row: Dict) -> Dict:
         """Evaluate a single search result using LLM"""
         # Prepare prompt
-        prompt = self.template.render(
-            {
-                "query": row["keyword"],
-                "query_category": row.get("top_category_name", ""),
-                "title": row["title"],
-                "category": row["category"],
-            }
-        )
+        prompt = render_prompt(self.template, row)
+
+        # Reserve the projected cost so that in-flight calls cannot overrun the budget
+        reserved_cost = 0.0
+        if self.usage_tracker is not None and self.usage_tracker.budget_usd is not None:
+            reserved_cost = self.usage_tracker.reserve(
+                count_tokens(prompt, self.model_name),
+                expected_completion_tokens(self.response_mode, self.max_tokens),
+            )
 
         # Get LLM response
-        response = self.client.chat.completions.create(
-            model=self.model_name, messages=[{"role": "user", "content": prompt}]
-        )
+        start = time.perf_counter()
+        try:
+            response = self.client.chat.completions.create(
+                model=self.model_name,
+                messages=[{"role": "user", "content": prompt}],
+                **self._completion_kwargs(),
+            )
+        except Exception:
+            if self.usage_tracker is not None:
+                self.usage_tracker.release(reserved_cost)
+            raise
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        usage = response.usage
+        if self.usage_tracker is not None:
+            self.usage_tracker.settle(
+                reserved_cost,
+                row["keyword"],
+                usage.prompt_tokens if usage else 0,
+                usage.completion_tokens if usage else 0,
+            )
+        result = {
+            "label": None,
+            "core_intent": None,
+            "ads_core_intent": None,
+            "prompt_tokens": usage.prompt_tokens if usage else None,
+            "completion_tokens": usage.completion_tokens if usage else None,
+            "latency_ms": latency_ms,
+            "parse_failed": False,
+        }
 
         # Parse response
         content = response.choices[0].message.content
-        result = json.loads(content)
+        try:
+            parsed = parse_llm_response(content)
+        except ValueError as e:
+            logger.warning(str(e))
+            result["parse_failed"] = True
+            return result
 
-        return {
-            "label": int(result["Score"]),
-            "core_intent": result["Core_intent"],
-            "ads_core_intent": result["Ads_core_intent"],
-        }
+        result.update(
+            {
+                "label": parsed["Score"],
+                "core_intent": parsed.get("Core_intent"),
+                "ads_core_intent": parsed.get("Ads_core_intent"),
+            }
+        )
+        return result
 
     def evaluate_batch(self, df: pd.DataFrame) -> pd.DataFrame:
         """Evaluate multiple search results in parallel"""
         target = df.iloc[: self.num_requests]
         results = []
+        num_failures = 0
+        num_skipped = 0
 
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             future_to_row = {
@@ -71,10 +245,24 @@ class LLMEvaluator:
                     result = future.result()
                     result.update({"product_id": target.iloc[row_idx]["product_id"]})
                     results.append(result)
+                except BudgetExceededError:
+                    num_skipped += 1
+                    continue
                 except Exception as e:
                     logger.error(f"Error processing row {row_idx}: {str(e)}")
+                    num_failures += 1
                     continue
 
-        df_results = pd.DataFrame(results)
+        if num_skipped:
+            logger.warning(f"LLM budget spent, skipped {num_skipped} of {len(target)} calls")
+
+        df_results = pd.DataFrame(results, columns=RESULT_COLUMNS)
+        if not df_results.empty:
+            logger.info(
+                f"LLM calls: {len(target)}, errors: {num_failures}, "
+                f"parse failures: {int(df_results['parse_failed'].sum())}, "
+                f"avg completion tokens: {df_results['completion_tokens'].mean():.1f}, "
+                f"avg latency: {df_results['latency_ms'].mean():.0f} ms"
+            )
         df_results = pd.merge(df_results, target, on="product_id", how="left")
         return df_results
@@ -33,6 +33,21 @@ def calculate_metrics(df: pd.DataFrame) -> Dict[str, float]:
     Returns:
         Dictionary containing averaged metrics across keywords
     """
+    # LLM usage covers every call that was paid for and timed, parsed or not
+    usage_metrics = {}
+    if "completion_tokens" in df.columns:
+        usage_metrics["avg_completion_tokens"] = df["completion_tokens"].mean()
+    if "latency_ms" in df.columns:
+        usage_metrics["avg_llm_latency_ms"] = df["latency_ms"].mean()
+        usage_metrics["p95_llm_latency_ms"] = df["latency_ms"].quantile(0.95)
+
+    # Responses that could not be parsed are kept for the failure rate only
+    parse_failure_rate = None
+    if "parse_failed" in df.columns:
+        parse_failed = df["parse_failed"].fillna(False).astype(bool)
+        parse_failure_rate = parse_failed.mean() if len(df) else 0.0
+        df = df[~parse_failed].astype({"label": int})
+
     # Calculate per-keyword metrics
     keyword_metrics = df.groupby("keyword").apply(
         lambda x: pd.Series(
@@ -82,4 +97,9 @@ def calculate_metrics(df: pd.DataFrame) -> Dict[str, float]:
     # Add weighted metrics if query counts are available
     metrics.update(weighted_metrics)
 
+    # Add LLM usage statistics if recorded
+    if parse_failure_rate is not None:
+        metrics["parse_failure_rate"] = parse_failure_rate
+    metrics.update(usage_metrics)
+
     return metrics
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Tuple
+
+
+def overlap_matrices(ranked_lists: List[List], k: int, p: float = 0.9) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pairwise rank-biased overlap and Jaccard between top-k result lists
+
+    Each pair is compared at depth max(len_a, len_b), capped at k. Ranks that
+    only the longer list fills count as disagreement, so a short list that is
+    a prefix of a long one scores low, while ranks that neither list fills are
+    not compared: two identical lists score 1 at any length.
+
+    Args:
+        ranked_lists: one list of distinct result ids per combo, best first
+        k: evaluation depth
+        p: RBO persistence, higher values weight deeper ranks more
+    Returns:
+        (rbo, jaccard) matrices of shape (num_combos, num_combos)
+    """
+    num_combos = len(ranked_lists)
+    top_k = [list(ids)[:k] for ids in ranked_lists]
+    all_ids = [doc_id for ids in top_k for doc_id in ids]
+    if not all_ids:
+        ones = np.ones((num_combos, num_combos))
+        return ones, ones.copy()
+
+    # Rank matrix (combos x distinct ids), 1-based ranks, inf where absent
+    unique_ids, codes = np.unique(np.array(all_ids, dtype=object).astype(str), return_inverse=True)
+    ranks = np.full((num_combos, len(unique_ids)), np.inf)
+    offset = 0
+    for i, ids in enumerate(top_k):
+        ranks[i, codes[offset : offset + len(ids)]] = np.arange(1, len(ids) + 1)
+        offset += len(ids)
+
+    # Jaccard from membership counts
+    membership = np.isfinite(ranks).astype(np.int64)
+    intersection = membership @ membership.T
+    sizes = membership.sum(axis=1)
+    union = sizes[:, None] + sizes[None, :] - intersection
+    jaccard = np.where(union > 0, intersection / np.maximum(union, 1), 1.0)
+
+    # An id enters the overlap of two lists at the deeper of its two ranks,
+    # so the overlap size at each depth d is the count of pairwise max ranks <= d
+    depths = np.arange(1, k + 1)
+    pair_depth = np.maximum(ranks[:, None, :], ranks[None, :, :])
+    overlap_at_depth = (pair_depth[..., None] <= depths).sum(axis=2)
+
+    # Extrapolated RBO (Webber et al., 2010) at the depth of the longer list
+    pair_len = np.maximum(sizes[:, None], sizes[None, :])
+    agreement = overlap_at_depth / depths
+    within = depths <= pair_len[..., None]
+    prefix_sum = (agreement * p**depths * within).sum(axis=2)
+    last = np.take_along_axis(agreement, np.maximum(pair_len - 1, 0)[..., None], axis=2)[..., 0]
+    rbo = last * p ** pair_len.astype(float) + (1 - p) / p * prefix_sum
+
+    # Two empty lists agree; one empty list has no overlap and already scores 0
+    rbo = np.where(pair_len > 0, rbo, 1.0)
+    return rbo, jaccard
+
+
+def summarize_overlap(
+    per_keyword: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    combos: List[str],
+    threshold: float = 0.9,
+    min_keywords: int = 5,
+) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """
+    Aggregate per-keyword overlap into combo x combo matrices and per-pair stats
+
+    A pair is flagged as indistinguishable when the lower bound of the 95%
+    confidence interval of its mean RBO across keywords reaches `threshold`.
+    With fewer than `min_keywords` keywords the interval is not meaningful and
+    the flag is NaN.
+
+    Returns:
+        (mean RBO matrix, mean Jaccard matrix, per-pair statistics)
+    """
+    rbo = np.stack([m[0] for m in per_keyword.values()])
+    jaccard = np.stack([m[1] for m in per_keyword.values()])
+    num_keywords = rbo.shape[0]
+
+    rbo_mean = rbo.mean(axis=0)
+    rbo_std = rbo.std(axis=0, ddof=1) if num_keywords > 1 else np.full_like(rbo_mean, np.nan)
+    rbo_ci_low = rbo_mean - 1.96 * rbo_std / np.sqrt(num_keywords)
+    enough_keywords = num_keywords >= max(min_keywords, 2)
+    jaccard_mean = jaccard.mean(axis=0)
+    same_set = np.isclose(jaccard, 1.0).mean(axis=0)
+
+    rows = []
+    for i, j in zip(*np.triu_indices(len(combos), k=1)):
+        rows.append(
+            {
+                "combo_a": combos[i],
+                "combo_b": combos[j],
+                "rbo_mean": rbo_mean[i, j],
+                "rbo_std": rbo_std[i, j],
+                "rbo_ci_low": rbo_ci_low[i, j],
+                "jaccard_mean": jaccard_mean[i, j],
+                "same_set_ratio": same_set[i, j],
+                "indistinguishable": bool(rbo_ci_low[i, j] >= threshold) if enough_keywords else np.nan,
+            }
+        )
+    df_pairs = pd.DataFrame(rows)
+    if not df_pairs.empty:
+        df_pairs = df_pairs.sort_values("rbo_mean", ascending=False, ignore_index=True)
+
+    return (
+        pd.DataFrame(rbo_mean, index=combos, columns=combos),
+        pd.DataFrame(jaccard_mean, index=combos, columns=combos),
+        df_pairs,
+    )
@@ -1,18 +1,19 @@
+import json
 import logging
-from typing import Dict
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
 import argparse
 import os
 from datetime import datetime
 
-from config import SearchConfig
-from evaluator.llm_evaluator import LLMEvaluator
-from evaluator.metrics import calculate_metrics
-from search.client import SearchClient
-from utils.data_processor import process_search_results
-import pandas as pd
+from config import SearchConfig, DSL_COMBOS, DSL_FILTERS, DSL_RANKINGS
 import time
 from utils.logging_config import setup_logging
 
+# pandas, openai, jinja2 and gRPC are imported inside the functions that need
+# them so that `--help` and argument errors return without loading them.
+if TYPE_CHECKING:
+    import pandas as pd
+
 # Define logger at module level
 logger = logging.getLogger(__name__)
 
@@ -29,8 +30,10 @@ def create_results_dir(dsl_filter: str, dsl_ranking: str) -> str:
     return result_dir
 
 
-def load_keywords(csv_path: str) -> pd.DataFrame:
+def load_keywords(csv_path: str) -> "pd.DataFrame":
     """Load keywords from CSV file"""
+    import pandas as pd
+
     try:
         df = pd.read_csv(csv_path)
         required_columns = ["keyword", "top_category_name", "query_count"]
@@ -46,30 +49,136 @@ def load_keywords(csv_path: str) -> pd.DataFrame:
         raise
 
 
+def create_search_client(config: SearchConfig):
+    from search.client import SearchClient
+
+    return SearchClient(
+        es_url=config.ES_URL,
+        es_index=config.ES_INDEX,
+        feature_platform_config={
+            "endpoint": config.FEATURE_PLATFORM_ENDPOINT,
+            "service": config.FEATURE_PLATFORM_SERVICE,
+            "method": config.FEATURE_PLATFORM_METHOD,
+            "descriptor_cache_dir": config.FEATURE_PLATFORM_DESCRIPTOR_CACHE_DIR,
+            "refresh_descriptors": config.FEATURE_PLATFORM_REFRESH_DESCRIPTORS,
+        },
+    )
+
+
+def llm_settings(config: SearchConfig) -> Dict:
+    """Prompt template, response mode and output token cap of the LLM judge"""
+    label_only = config.LLM_RESPONSE_MODE == "label"
+    # The prompt's output format has to match the response mode's JSON schema
+    prompt_template_paths = {
+        "free": config.PROMPT_TEMPLATE_PATH,
+        "structured": config.STRUCTURED_PROMPT_TEMPLATE_PATH,
+        "label": config.LABEL_PROMPT_TEMPLATE_PATH,
+    }
+    return {
+        "prompt_template_path": prompt_template_paths[config.LLM_RESPONSE_MODE],
+        "response_mode": config.LLM_RESPONSE_MODE,
+        "max_tokens": config.LLM_LABEL_MAX_TOKENS if label_only else None,
+    }
+
+
+def create_llm_evaluator(config: SearchConfig, usage_tracker=None, num_requests: Optional[int] = None):
+    from evaluator.llm_evaluator import LLMEvaluator
+
+    return LLMEvaluator(
+        api_key=config.OPENAI_API_KEY,
+        model_name=config.OPENAI_MODEL,
+        num_requests=num_requests or config.NUM_LLM_REQUESTS,
+        max_workers=config.NUM_WORKERS,
+        usage_tracker=usage_tracker,
+        **llm_settings(config),
+    )
+
+
+def plan_evaluation(
+    keywords_df: "pd.DataFrame", dsl_filter: str, dsl_ranking: str, config: SearchConfig
+) -> Dict:
+    """
+    Project LLM calls, tokens, cost and wall time of a run before judging
+
+    Searches a sample of keywords, renders the judge prompts for their top
+    results and extrapolates to the whole keyword file, for this combo and
+    for running main.py on every combo (run.sh). If a budget is set, also
+    chooses how many keywords and ranks per keyword to judge within it.
+    run_sweep.py judges the union of the combos' results instead and plans
+    that with `run_sweep.py --plan`.
+    """
+    from evaluator.cost import allocate_budget, plan_run, require_pricing
+    from evaluator.llm_evaluator import load_prompt_template, render_prompt
+    from utils.data_processor import process_search_results
+
+    search_client = create_search_client(config)
+    settings = llm_settings(config)
+    template = load_prompt_template(settings["prompt_template_path"])
+
+    prompts, num_judged = [], []
+    sample_df = keywords_df.sample(
+        n=min(config.PLAN_SAMPLE_KEYWORDS, len(keywords_df)), random_state=0
+    )
+    for _, row in sample_df.iterrows():
+        search_results = search_client.search(
+            keyword=row["keyword"], dsl_filter=dsl_filter, dsl_ranking=dsl_ranking
+        )
+        df_results = process_search_results(keyword=row["keyword"], search_results=search_results)
+        target = df_results.iloc[: config.NUM_LLM_REQUESTS]
+        num_judged.append(len(target))
+        for _, result in target.iterrows():
+            result = result.to_dict()
+            result["top_category_name"] = row["top_category_name"]
+            prompts.append(render_prompt(template, result))
+
+    plan_kwargs = {
+        "prompts": prompts,
+        "num_keywords": len(keywords_df),
+        "ranks_per_keyword": sum(num_judged) / len(num_judged) if num_judged else 0,
+        "model": config.OPENAI_MODEL,
+        "response_mode": settings["response_mode"],
+        "max_workers": config.NUM_WORKERS,
+        "avg_latency_s": config.LLM_AVG_LATENCY_S,
+        "max_tokens": settings["max_tokens"],
+    }
+    plan = {
+        "combo": plan_run(**plan_kwargs),
+        "sweep": plan_run(**plan_kwargs, num_combos=len(DSL_COMBOS)),
+    }
+
+    if config.LLM_BUDGET_USD is not None and plan["combo"]["calls"]:
+        require_pricing(config.OPENAI_MODEL)
+        plan["allocation"] = allocate_budget(
+            budget_usd=config.LLM_BUDGET_USD,
+            cost_per_call=plan["combo"]["cost_usd"] / plan["combo"]["calls"],
+            num_keywords=len(keywords_df),
+            max_ranks=config.NUM_LLM_REQUESTS,
+            min_ranks=config.MIN_RANKS_PER_KEYWORD,
+        )
+
+    return plan
+
+
 def run_evaluation(
-    keywords_df: pd.DataFrame, dsl_filter: str, dsl_ranking: str, config: SearchConfig
+    keywords_df: "pd.DataFrame", dsl_filter: str, dsl_ranking: str, config: SearchConfig
 ) -> Dict:
     """Run evaluation pipeline for search results"""
+    import pandas as pd
+    from evaluator.cost import UsageTracker
+    from evaluator.metrics import calculate_metrics
+    from utils.data_processor import process_search_results
+
     try:
-        search_client = SearchClient(
-            es_url=config.ES_URL,
-            es_index=config.ES_INDEX,
-            feature_platform_config={
-                "endpoint": config.FEATURE_PLATFORM_ENDPOINT,
-                "service": config.FEATURE_PLATFORM_SERVICE,
-                "method": config.FEATURE_PLATFORM_METHOD,
-            },
-        )
-        llm_evaluator = LLMEvaluator(
-            api_key=config.OPENAI_API_KEY,
-            model_name=config.OPENAI_MODEL,
-            prompt_template_path=config.PROMPT_TEMPLATE_PATH,
-            num_requests=config.NUM_LLM_REQUESTS,
-            max_workers=config.NUM_WORKERS,
+        search_client = create_search_client(config)
+        usage_tracker = UsageTracker(
+            model=config.OPENAI_MODEL,
+            combo=f"{dsl_filter}_{dsl_ranking}",
+            budget_usd=config.LLM_BUDGET_USD,
         )
+        llm_evaluator = create_llm_evaluator(config, usage_tracker=usage_tracker)
 
-        results = []
-        for i, row in keywords_df.iterrows():
+        results, partial_keywords = [], []
+        for i, (_, row) in enumerate(keywords_df.iterrows()):
             keyword = row["keyword"]
             top_category_name = row["top_category_name"]
             query_count = row["query_count"]
@@ -84,7 +193,12 @@ def run_evaluation(
                 keyword=keyword, search_results=search_results
             )
 
+            refused_calls = usage_tracker.refused_calls
             llm_results = llm_evaluator.evaluate_batch(df_results)
+            if usage_tracker.refused_calls > refused_calls:
+                # The judged calls depend on completion order, not rank, so
+                # the keyword's precision and NDCG would use arbitrary ranks
+                partial_keywords.append(keyword)
             llm_results["keyword"] = keyword
             llm_results["num_results"] = len(df_results)
             llm_results["top_category_name"] = top_category_name
@@ -92,6 +206,12 @@ def run_evaluation(
 
             results.append(llm_results)
 
+            if usage_tracker.exhausted:
+                logger.warning(
+                    f"LLM budget of ${config.LLM_BUDGET_USD:.2f} spent, stopping after {i+1} keywords"
+                )
+                break
+
             time.sleep(1)
 
         df_all = pd.concat(results, ignore_index=True)
@@ -108,11 +228,22 @@ def run_evaluation(
                 "depth1_category",
                 "depth2_category",
                 "depth3_category",
+                "prompt_tokens",
+                "completion_tokens",
+                "latency_ms",
+                "parse_failed",
             ]
         ]
-        metrics = calculate_metrics(df_all)
+        if partial_keywords:
+            logger.warning(f"Excluding partly judged keywords from metrics: {partial_keywords}")
+        df_judged = df_all[~df_all["keyword"].isin(partial_keywords)]
+        if df_judged.empty:
+            raise ValueError("LLM budget ran out before any keyword was fully judged")
+        metrics = calculate_metrics(df_judged)
+        metrics.update(usage_tracker.summary())
+        metrics["budget_exhausted"] = usage_tracker.exhausted
 
-        return {"metrics": metrics, "detailed_results": df_all}
+        return {"metrics": metrics, "detailed_results": df_all, "usage": usage_tracker.to_frame()}
 
     except Exception as e:
         logger.error(f"Error in evaluation pipeline: {str(e)}")
@@ -121,11 +252,14 @@ def run_evaluation(
 
 def save_results(results: Dict, result_dir: str):
     """Save evaluation results to files"""
+    import pandas as pd
+
     results["detailed_results"].to_csv(
         os.path.join(result_dir, "detailed_results.csv"), index=False
     )
     result = results["detailed_results"][["keyword", "title", "label", "score"]]
     result.to_csv(os.path.join(result_dir, "results.csv"), index=False)
+    results["usage"].to_csv(os.path.join(result_dir, "usage.csv"), index=False)
 
     metrics_df = pd.DataFrame([results["metrics"]])
     metrics_df.to_json(
@@ -133,20 +267,56 @@ def save_results(results: Dict, result_dir: str):
     )
 
 
+def parse_combo(value: str) -> Tuple[str, str]:
+    """Parse a `filter:ranking` combo argument"""
+    dsl_filter, sep, dsl_ranking = value.partition(":")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"Combo must be filter:ranking, got {value!r}")
+    if dsl_filter not in DSL_FILTERS:
+        raise argparse.ArgumentTypeError(f"Unknown DSL filter {dsl_filter!r}, choose from {DSL_FILTERS}")
+    if dsl_ranking not in DSL_RANKINGS:
+        raise argparse.ArgumentTypeError(f"Unknown DSL ranking {dsl_ranking!r}, choose from {DSL_RANKINGS}")
+    return dsl_filter, dsl_ranking
+
+
+def add_llm_arguments(parser: argparse.ArgumentParser):
+    """Arguments overriding the LLM judge settings, applied by apply_llm_arguments"""
+    parser.add_argument(
+        "--response-mode",
+        type=str,
+        default=None,
+        choices=["free", "structured", "label"],
+        help="LLM output mode (default: config LLM_RESPONSE_MODE)",
+    )
+    parser.add_argument(
+        "--budget-usd",
+        type=float,
+        default=None,
+        help="Hard cap on LLM spend; the run stops with partial results once reached",
+    )
+
+
+def apply_llm_arguments(args: argparse.Namespace, config: SearchConfig):
+    if args.response_mode:
+        config.LLM_RESPONSE_MODE = args.response_mode
+    if args.budget_usd is not None:
+        config.LLM_BUDGET_USD = args.budget_usd
+
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Evaluate search DSLs")
     parser.add_argument(
         "--dsl-filter",
         type=str,
         required=True,
-        choices=["fasttext", "llm_depth1", "llm_depth2", "llm_depth3"],
+        choices=DSL_FILTERS,
         help="Filter DSLs by prefix (e.g. llm_category_match)",
     )
     parser.add_argument(
         "--dsl-ranking",
         type=str,
         required=True,
-        choices=["fasttext", "llm_depth123_score123", "llm_depth123_score12", "llm_depth23_score123", "llm_depth23_score12", "llm_depth3_score123", "llm_depth3_score12"],
+        choices=DSL_RANKINGS,
         help="Ranking DSLs by category depth",
     )
     parser.add_argument(
@@ -155,6 +325,17 @@ def parse_args():
         required=True,
         help="Path to CSV file containing keywords",
     )
+    add_llm_arguments(parser)
+    parser.add_argument(
+        "--refresh-descriptors",
+        action="store_true",
+        help="Re-fetch feature platform descriptors via reflection and rewrite the cache",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Only project LLM calls, tokens, cost and wall time, without judging",
+    )
     return parser.parse_args()
 
 
@@ -169,6 +350,39 @@ def main():
     keywords_df.to_csv(os.path.join(result_dir, "input_keywords.csv"), index=False)
 
     config = SearchConfig()
+    apply_llm_arguments(args, config)
+    if args.refresh_descriptors:
+        config.FEATURE_PLATFORM_REFRESH_DESCRIPTORS = True
+
+    if args.plan or config.LLM_BUDGET_USD is not None:
+        plan = plan_evaluation(
+            keywords_df=keywords_df, dsl_filter=args.dsl_filter, dsl_ranking=args.dsl_ranking, config=config
+        )
+        with open(os.path.join(result_dir, "plan.json"), "w") as f:
+            json.dump(plan, f, indent=2)
+        for scope in ("combo", "sweep"):
+            logger.info(
+                f"Plan ({scope}, {plan[scope]['num_combos']} combos): {plan[scope]['calls']:.0f} calls, "
+                f"{plan[scope]['prompt_tokens']:.0f} prompt + {plan[scope]['completion_tokens']:.0f} completion tokens, "
+                f"${plan[scope]['cost_usd']:.2f}, {plan[scope]['wall_time_s'] / 60:.1f} min"
+            )
+        if args.plan:
+            return
+
+        allocation = plan.get("allocation")
+        if allocation:
+            logger.info(
+                f"Budget ${config.LLM_BUDGET_USD:.2f}: judging {allocation['num_keywords']} keywords "
+                f"x {allocation['ranks_per_keyword']} ranks"
+            )
+            if allocation["num_keywords"] == 0:
+                logger.error("LLM budget is too small to judge a single keyword")
+                return
+            # Keyword files are usually sorted by query_count, so take a seeded
+            # sample rather than the head to keep the subset representative
+            keywords_df = keywords_df.sample(n=allocation["num_keywords"], random_state=0).sort_index()
+            config.NUM_LLM_REQUESTS = allocation["ranks_per_keyword"]
+
     logger.info(f"\nEvaluating DSL: filter {args.dsl_filter}, ranking {args.dsl_ranking}")
     results = run_evaluation(
         keywords_df=keywords_df, dsl_filter=args.dsl_filter, dsl_ranking=args.dsl_ranking, config=config
@@ -1,3 +1,5 @@
+# python run_sweep.py --keywords-file keywords/sample_keyword.csv --overlap-only
+
 # python main.py --dsl-filter fasttext --dsl-ranking fasttext --keywords-file keywords/sample_keyword.csv
 
 # python main.py --dsl-filter llm_depth1 --dsl-ranking llm_depth123_score123 --keywords-file keywords/sample_keyword.csv
@@ -0,0 +1,346 @@
+import logging
+from typing import Dict, List, Tuple, TYPE_CHECKING
+import argparse
+import json
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from config import SearchConfig, DSL_COMBOS
+from main import (
+    add_llm_arguments,
+    apply_llm_arguments,
+    create_llm_evaluator,
+    create_search_client,
+    llm_settings,
+    load_keywords,
+    parse_combo,
+)
+from utils.logging_config import setup_logging
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def combo_name(dsl_filter: str, dsl_ranking: str) -> str:
+    return f"{dsl_filter}_{dsl_ranking}"
+
+
+def search_combos(
+    search_client, keyword: str, combos: List[Tuple[str, str]], max_workers: int
+) -> Dict[str, "pd.DataFrame"]:
+    """Search a keyword with every combo, sharing DSL parameters and the random tie-breaker seed"""
+    from utils.data_processor import process_search_results
+
+    dsl_params = search_client.get_dsl_params(keyword)
+    random_seed = zlib.crc32(keyword.encode("utf-8"))
+
+    def run(combo):
+        dsl_filter, dsl_ranking = combo
+        search_results = search_client.search(
+            keyword=keyword,
+            dsl_filter=dsl_filter,
+            dsl_ranking=dsl_ranking,
+            dsl_params=dsl_params,
+            random_seed=random_seed,
+        )
+        return process_search_results(keyword=keyword, search_results=search_results)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(run, combos)
+        return {combo_name(*combo): df for combo, df in zip(combos, results)}
+
+
+def run_overlap(
+    keywords_df: "pd.DataFrame", combos: List[Tuple[str, str]], top_k: int, config: SearchConfig
+) -> Dict:
+    """Search all combos for every keyword and compute top-k overlap between them"""
+    from evaluator.overlap import overlap_matrices, summarize_overlap
+
+    search_client = create_search_client(config)
+    names = [combo_name(*combo) for combo in combos]
+
+    search_results, per_keyword = {}, {}
+    for i, (_, row) in enumerate(keywords_df.iterrows()):
+        keyword = row["keyword"]
+        logger.info(f"Searching keyword ({i+1}/{len(keywords_df)}): {keyword}")
+
+        results = search_combos(search_client, keyword, combos, max_workers=min(len(combos), 8))
+        search_results[keyword] = results
+        ranked_lists = [
+            results[name]["product_id"].iloc[:top_k].tolist() if not results[name].empty else []
+            for name in names
+        ]
+        per_keyword[keyword] = overlap_matrices(ranked_lists, k=top_k, p=config.OVERLAP_RBO_P)
+
+    rbo, jaccard, pairs = summarize_overlap(
+        per_keyword, names, threshold=config.OVERLAP_THRESHOLD, min_keywords=config.OVERLAP_MIN_KEYWORDS
+    )
+    if len(per_keyword) < config.OVERLAP_MIN_KEYWORDS:
+        logger.warning(
+            f"Only {len(per_keyword)} keywords, at least {config.OVERLAP_MIN_KEYWORDS} are needed "
+            f"to flag indistinguishable combos"
+        )
+    flagged = pairs["indistinguishable"].fillna(False).astype(bool) if not pairs.empty else []
+    for _, pair in pairs[flagged].iterrows():
+        logger.warning(
+            f"Indistinguishable top-{top_k}: {pair['combo_a']} vs {pair['combo_b']} "
+            f"(RBO {pair['rbo_mean']:.3f}, CI low {pair['rbo_ci_low']:.3f})"
+        )
+
+    return {"search_results": search_results, "rbo": rbo, "jaccard": jaccard, "pairs": pairs}
+
+
+def union_top_k(results: Dict[str, "pd.DataFrame"], top_k: int) -> "pd.DataFrame":
+    """Distinct ads in the top k of any combo, with their best rank across combos"""
+    import pandas as pd
+
+    top_results = [df.iloc[:top_k].assign(first_rank=range(1, min(len(df), top_k) + 1)) for df in results.values()]
+    union_df = pd.concat(top_results, ignore_index=True)
+    if union_df.empty:
+        return union_df
+    union_df = union_df.sort_values("first_rank", kind="stable").drop_duplicates("product_id")
+    return union_df.reset_index(drop=True)
+
+
+def plan_sweep(
+    keywords_df: "pd.DataFrame", search_results: Dict, top_k: int, config: SearchConfig
+) -> Dict:
+    """
+    Project LLM calls, tokens, cost and wall time of judging the union of
+    the combos' top-k ads per keyword, from the searches of the overlap step.
+    If a budget is set, also chooses how many keywords and ranks per combo
+    to judge within it.
+    """
+    from evaluator.cost import allocate_union_budget, plan_run, require_pricing
+    from evaluator.llm_evaluator import load_prompt_template, render_prompt
+
+    settings = llm_settings(config)
+    template = load_prompt_template(settings["prompt_template_path"])
+    sample_keywords = set(
+        keywords_df.sample(n=min(config.PLAN_SAMPLE_KEYWORDS, len(keywords_df)), random_state=0)["keyword"]
+    )
+
+    prompts, first_ranks = [], []
+    for _, row in keywords_df.iterrows():
+        union_df = union_top_k(search_results[row["keyword"]], top_k)
+        first_ranks.append(union_df["first_rank"].tolist())
+        if row["keyword"] in sample_keywords:
+            for _, result in union_df.iterrows():
+                result = result.to_dict()
+                result["top_category_name"] = row["top_category_name"]
+                prompts.append(render_prompt(template, result))
+
+    plan = {
+        "union": plan_run(
+            prompts=prompts,
+            num_keywords=len(keywords_df),
+            ranks_per_keyword=sum(len(r) for r in first_ranks) / len(first_ranks) if first_ranks else 0,
+            model=config.OPENAI_MODEL,
+            response_mode=settings["response_mode"],
+            max_workers=config.NUM_WORKERS,
+            avg_latency_s=config.LLM_AVG_LATENCY_S,
+            max_tokens=settings["max_tokens"],
+        )
+    }
+
+    if config.LLM_BUDGET_USD is not None and plan["union"]["calls"]:
+        require_pricing(config.OPENAI_MODEL)
+        plan["allocation"] = allocate_union_budget(
+            budget_usd=config.LLM_BUDGET_USD,
+            cost_per_call=plan["union"]["cost_usd"] / plan["union"]["calls"],
+            first_ranks=first_ranks,
+            max_ranks=top_k,
+            min_ranks=config.MIN_RANKS_PER_KEYWORD,
+        )
+
+    return plan
+
+
+def judge_union(
+    keywords_df: "pd.DataFrame", search_results: Dict, top_k: int, config: SearchConfig
+) -> Dict:
+    """
+    Judge the union of distinct top-k ads per keyword once and compute metrics
+    for every combo from the shared labels
+    """
+    import pandas as pd
+    from evaluator.cost import UsageTracker
+    from evaluator.metrics import calculate_metrics
+
+    names = list(next(iter(search_results.values())).keys())
+    usage_tracker = UsageTracker(
+        model=config.OPENAI_MODEL, combo="sweep", budget_usd=config.LLM_BUDGET_USD
+    )
+    llm_evaluator = create_llm_evaluator(
+        config, usage_tracker=usage_tracker, num_requests=len(names) * top_k
+    )
+
+    detailed, partial_keywords, num_union, num_per_combo = [], [], 0, 0
+    for i, (_, row) in enumerate(keywords_df.iterrows()):
+        keyword = row["keyword"]
+        results = search_results[keyword]
+        top_results = {name: df.iloc[:top_k] for name, df in results.items()}
+
+        union_df = union_top_k(results, top_k)
+        if union_df.empty:
+            continue
+        num_union += len(union_df)
+        num_per_combo += sum(len(df) for df in top_results.values())
+        logger.info(
+            f"Judging keyword ({i+1}/{len(keywords_df)}): {keyword}, "
+            f"{len(union_df)} distinct ads across {len(names)} combos"
+        )
+
+        refused_calls = usage_tracker.refused_calls
+        labels = llm_evaluator.evaluate_batch(union_df)[
+            ["product_id", "label", "core_intent", "ads_core_intent", "prompt_tokens", "completion_tokens", "latency_ms", "parse_failed"]
+        ]
+        if usage_tracker.refused_calls > refused_calls:
+            # Unjudged ads would silently drop out of each combo's ranking
+            partial_keywords.append(keyword)
+        for name, df in top_results.items():
+            df_combo = df.merge(labels, on="product_id", how="inner")
+            df_combo["combo"] = name
+            df_combo["num_results"] = len(results[name])
+            df_combo["top_category_name"] = row["top_category_name"]
+            df_combo["query_count"] = row["query_count"]
+            detailed.append(df_combo)
+
+        if usage_tracker.exhausted:
+            logger.warning(
+                f"LLM budget of ${config.LLM_BUDGET_USD:.2f} spent, stopping after {i+1} keywords"
+            )
+            break
+
+    logger.info(f"Judged {num_union} distinct ads instead of {num_per_combo} per-combo ads")
+
+    if not detailed:
+        logger.warning("No search results to judge for any keyword")
+        return {
+            "metrics": pd.DataFrame(columns=["combo"]),
+            "detailed_results": pd.DataFrame(),
+            "usage": usage_tracker.to_frame(),
+        }
+
+    df_all = pd.concat(detailed, ignore_index=True)
+    if partial_keywords:
+        logger.warning(f"Excluding partly judged keywords from metrics: {partial_keywords}")
+    df_judged = df_all[~df_all["keyword"].isin(partial_keywords)]
+    metrics = []
+    for name in names:
+        df_combo = df_judged[df_judged["combo"] == name]
+        if not df_combo.empty:
+            metrics.append({"combo": name, **calculate_metrics(df_combo)})
+
+    return {
+        "metrics": pd.DataFrame(metrics),
+        "detailed_results": df_all,
+        "usage": usage_tracker.to_frame(),
+    }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Compare top-k overlap of DSL combos and judge the union of their results"
+    )
+    parser.add_argument(
+        "--keywords-file",
+        type=str,
+        required=True,
+        help="Path to CSV file containing keywords",
+    )
+    parser.add_argument(
+        "--combos",
+        type=parse_combo,
+        nargs="*",
+        help="Combos as filter:ranking (default: all evaluated combos)",
+    )
+    parser.add_argument(
+        "--top-k",
+        type=int,
+        default=None,
+        help="Depth of the compared and judged lists (default: config NUM_LLM_REQUESTS)",
+    )
+    parser.add_argument(
+        "--overlap-only",
+        action="store_true",
+        help="Stop after the overlap analysis, without judging",
+    )
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="Stop after projecting LLM calls, tokens, cost and wall time of judging the union",
+    )
+    add_llm_arguments(parser)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    config = SearchConfig()
+    apply_llm_arguments(args, config)
+    top_k = args.top_k or config.NUM_LLM_REQUESTS
+    combos = args.combos or DSL_COMBOS
+
+    keywords_df = load_keywords(args.keywords_file)
+    result_dir = os.path.join("results", f"sweep_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    os.makedirs(result_dir)
+
+    setup_logging(logs_dir=result_dir)
+    logger.info(f"Results will be saved to: {result_dir}")
+    keywords_df.to_csv(os.path.join(result_dir, "input_keywords.csv"), index=False)
+
+    overlap = run_overlap(keywords_df=keywords_df, combos=combos, top_k=top_k, config=config)
+    overlap["rbo"].to_csv(os.path.join(result_dir, "overlap_rbo.csv"))
+    overlap["jaccard"].to_csv(os.path.join(result_dir, "overlap_jaccard.csv"))
+    overlap["pairs"].to_csv(os.path.join(result_dir, "overlap_pairs.csv"), index=False)
+    if args.overlap_only:
+        return
+
+    if args.plan or config.LLM_BUDGET_USD is not None:
+        plan = plan_sweep(
+            keywords_df=keywords_df, search_results=overlap["search_results"], top_k=top_k, config=config
+        )
+        with open(os.path.join(result_dir, "plan.json"), "w") as f:
+            json.dump(plan, f, indent=2)
+        union = plan["union"]
+        logger.info(
+            f"Plan (union of {len(combos)} combos): {union['calls']:.0f} calls, "
+            f"{union['prompt_tokens']:.0f} prompt + {union['completion_tokens']:.0f} completion tokens, "
+            f"${union['cost_usd']:.2f}, {union['wall_time_s'] / 60:.1f} min"
+        )
+        if args.plan:
+            return
+
+        allocation = plan.get("allocation")
+        if allocation:
+            logger.info(
+                f"Budget ${config.LLM_BUDGET_USD:.2f}: judging {allocation['num_keywords']} keywords "
+                f"x top {allocation['ranks_per_keyword']} ranks per combo"
+            )
+            if allocation["num_keywords"] == 0:
+                logger.error("LLM budget is too small to judge a single keyword")
+                return
+            # Same seeded sample as main.py, so the subset stays representative
+            keywords_df = keywords_df.sample(n=allocation["num_keywords"], random_state=0).sort_index()
+            top_k = allocation["ranks_per_keyword"]
+
+    results = judge_union(
+        keywords_df=keywords_df, search_results=overlap["search_results"], top_k=top_k, config=config
+    )
+    results["metrics"].to_csv(os.path.join(result_dir, "metrics.csv"), index=False)
+    results["detailed_results"].to_csv(os.path.join(result_dir, "detailed_results.csv"), index=False)
+    results["usage"].to_csv(os.path.join(result_dir, "usage.csv"), index=False)
+
+    if not results["metrics"].empty:
+        logger.info("\nMetrics:")
+        logger.info(results["metrics"][["combo", "avg_precision", "avg_ndcg"]].to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,14 @@
 import requests
 import json
 import re
-from typing import Dict, Any, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
 import logging
 import ast
-from grpc_requests import Client
+
+from search.feature_platform import FeaturePlatformClient
 
 logger = logging.getLogger(__name__)
 
@@ -14,7 +18,19 @@ class SearchClient:
         self.es_url = es_url
         self.es_index = es_index
         self.feature_platform_config = feature_platform_config
-        self.fp_client = Client.get_by_endpoint(feature_platform_config["endpoint"])
+        self._fp_client = None
+
+    @property
+    def fp_client(self) -> FeaturePlatformClient:
+        """Feature platform client, built on first use from cached descriptors"""
+        if self._fp_client is None:
+            self._fp_client = FeaturePlatformClient(
+                endpoint=self.feature_platform_config["endpoint"],
+                service=self.feature_platform_config["service"],
+                descriptor_cache_dir=self.feature_platform_config.get("descriptor_cache_dir"),
+                refresh_descriptors=self.feature_platform_config.get("refresh_descriptors", False),
+            )
+        return self._fp_client
 
     def get_keyword_category_weights(
         self, keyword: str, depth: int = 1
@@ -110,28 +126,129 @@ class SearchClient:
                 "category_3_weights": {},
             }
 
-    def search(self, keyword: str, dsl_filter: str, dsl_ranking: str) -> Dict[str, Any]:
-        """Execute search with specified DSL"""
+    def search(
+        self,
+        keyword: str,
+        dsl_filter: str,
+        dsl_ranking: str,
+        dsl_params: Optional[Dict[str, Any]] = None,
+        random_seed: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """
+        Execute search with specified DSL
+
+        Args:
+            dsl_params: precomputed DSL parameters, fetched from the feature platform if not given
+            random_seed: seed for the random_score tie-breaker, so that different
+                combos order equally scored ads the same way
+        """
         try:
             # Get DSL parameters
-            dsl_params = self.get_dsl_params(keyword)
+            if dsl_params is None:
+                dsl_params = self.get_dsl_params(keyword)
 
             # Get DSL for the keyword
             dsl = self._get_dsl(keyword, dsl_filter, dsl_ranking, dsl_params)
+            if random_seed is not None:
+                for function in dsl["query"]["function_score"]["functions"]:
+                    if "random_score" in function:
+                        function["random_score"] = {"seed": random_seed, "field": "_seq_no"}
 
             # Execute search
-            url = f"{self.es_url}/{self.es_index}/_search"
-            headers = {"Content-Type": "application/json"}
-
-            response = requests.post(url, headers=headers, data=json.dumps(dsl))
-            response.raise_for_status()
-
-            return response.json()["hits"]["hits"]
+            return self._execute(dsl)["hits"]["hits"]
 
         except Exception as e:
             logger.error(f"Search error: {str(e)}")
             raise
 
+    def _execute(self, dsl: Dict[str, Any], session: Optional[requests.Session] = None) -> Dict[str, Any]:
+        url = f"{self.es_url}/{self.es_index}/_search"
+        headers = {"Content-Type": "application/json"}
+
+        response = (session or requests).post(url, headers=headers, data=json.dumps(dsl))
+        response.raise_for_status()
+
+        return response.json()
+
+    def benchmark(
+        self,
+        keywords: List[str],
+        dsl_filter: str,
+        dsl_ranking: str,
+        concurrency: int = 4,
+        warmup: int = 1,
+        repeat: int = 3,
+        profile: bool = False,
+        dsl_params: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Replay the keyword set with the given DSL combo and measure serving cost
+
+        Args:
+            keywords: keywords to replay
+            dsl_filter, dsl_ranking: DSL combo to benchmark
+            concurrency: number of parallel requests
+            warmup: untimed passes over the keyword set before measuring
+            repeat: timed passes over the keyword set
+            profile: after the timed passes, run one untimed pass with
+                `profile: true` and aggregate time per query clause
+            dsl_params: precomputed DSL parameters per keyword, so feature
+                platform calls are shared across combos and kept out of timing
+        Returns:
+            Dictionary with ES `took` and client latency percentiles (ms),
+            DSL size statistics and, if profiled, mean time per clause (ms)
+        """
+        dsls = []
+        for keyword in keywords:
+            params = dsl_params[keyword] if dsl_params is not None else self.get_dsl_params(keyword)
+            dsls.append(self._get_dsl(keyword, dsl_filter, dsl_ranking, params))
+
+        local = threading.local()
+
+        def run(dsl):
+            if not hasattr(local, "session"):
+                local.session = requests.Session()
+            start = time.perf_counter()
+            result = self._execute(dsl, session=local.session)
+            return (time.perf_counter() - start) * 1000, result
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for _ in range(warmup):
+                list(executor.map(run, dsls))
+
+            latencies, tooks = [], []
+            for _ in range(repeat):
+                for latency_ms, result in executor.map(run, dsls):
+                    latencies.append(latency_ms)
+                    tooks.append(result.get("took", 0))
+
+            # Profiling adds overhead to ES, so it gets its own pass outside the timings
+            clause_nanos = {}
+            if profile:
+                for _, result in executor.map(run, [{**dsl, "profile": True} for dsl in dsls]):
+                    _accumulate_profile(result.get("profile", {}), clause_nanos)
+
+        num_requests = len(latencies)
+        report = {
+            "dsl_filter": dsl_filter,
+            "dsl_ranking": dsl_ranking,
+            "num_keywords": len(keywords),
+            "num_requests": num_requests,
+            "concurrency": concurrency,
+            "avg_filter_terms": _mean([_count_terms(dsl["query"]["function_score"]["query"]) for dsl in dsls]),
+            "avg_ranking_functions": _mean([len(dsl["query"]["function_score"]["functions"]) for dsl in dsls]),
+            "took_mean_ms": _mean(tooks),
+        }
+        for q in (50, 90, 99):
+            report[f"took_p{q}_ms"] = _percentile(tooks, q)
+            report[f"latency_p{q}_ms"] = _percentile(latencies, q)
+        if profile and dsls:
+            report["profile_ms"] = {
+                clause: nanos / len(dsls) / 1e6
+                for clause, nanos in sorted(clause_nanos.items(), key=lambda x: -x[1])
+            }
+        return report
+
     def _get_dsl(
         self, keyword: str, dsl_filter: str, dsl_ranking: str, params: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -164,6 +281,50 @@ class SearchClient:
         return dsl
 
 
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = (len(values) - 1) * q / 100
+    lower = int(index)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (index - lower)
+
+
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+def _count_terms(node: Any) -> int:
+    """Count the values sent in `terms` clauses of a DSL fragment"""
+    if isinstance(node, dict):
+        count = 0
+        for key, value in node.items():
+            if key == "terms" and isinstance(value, dict):
+                count += sum(len(v) for v in value.values() if isinstance(v, list))
+            else:
+                count += _count_terms(value)
+        return count
+    if isinstance(node, list):
+        return sum(_count_terms(item) for item in node)
+    return 0
+
+
+def _accumulate_profile(profile: Dict[str, Any], clause_nanos: Dict[str, int]) -> None:
+    """Sum `time_in_nanos` per query clause type over all shards of a profiled response"""
+
+    def visit(node, path):
+        key = f"{path}/{node['type']}" if path else node["type"]
+        clause_nanos[key] = clause_nanos.get(key, 0) + node.get("time_in_nanos", 0)
+        for child in node.get("children", []):
+            visit(child, key)
+
+    for shard in profile.get("shards", []):
+        for search in shard.get("searches", []):
+            for query in search.get("query", []):
+                visit(query, "")
+
+
 def get_filter_dsl(keyword: str, dsl_filter: str, params: Dict[str, Any]) -> Dict[str, Any]:
     # { fasttext, llm_depth1, llm_depth2, llm_depth3 }
     filter_dsl = [
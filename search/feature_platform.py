@@ -0,0 +1,161 @@
+import logging
+import os
+import re
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class FeaturePlatformClient:
+    """
+    Minimal unary gRPC client for the feature platform.
+
+    Service descriptors are loaded from a serialized FileDescriptorSet on disk
+    when available, so the client can be built without a reflection round trip.
+    On a cache miss the descriptors are fetched once via server reflection and
+    written to the cache for the next run.
+
+    The cache file is keyed on endpoint and service. It is not invalidated when
+    the server's protos evolve (new response fields would be dropped), so pass
+    `refresh_descriptors=True` (`main.py --refresh-descriptors`) or delete the
+    cache directory after a feature platform schema change.
+    """
+
+    def __init__(
+        self,
+        endpoint: str,
+        service: str,
+        descriptor_cache_dir: Optional[str] = None,
+        refresh_descriptors: bool = False,
+    ):
+        import grpc
+
+        self.endpoint = endpoint
+        self.service = service
+        self.descriptor_cache_path = (
+            descriptor_cache_path(descriptor_cache_dir, endpoint, service) if descriptor_cache_dir else None
+        )
+        self.refresh_descriptors = refresh_descriptors
+        self.channel = grpc.insecure_channel(endpoint)
+        self.pool = self._load_descriptor_pool()
+        self._methods = {}
+
+    def _load_descriptor_pool(self):
+        from google.protobuf import descriptor_pb2, descriptor_pool
+
+        if (
+            self.descriptor_cache_path
+            and not self.refresh_descriptors
+            and os.path.exists(self.descriptor_cache_path)
+        ):
+            try:
+                file_set = descriptor_pb2.FileDescriptorSet()
+                with open(self.descriptor_cache_path, "rb") as f:
+                    file_set.ParseFromString(f.read())
+
+                pool = descriptor_pool.DescriptorPool()
+                for file_proto in file_set.file:
+                    pool.Add(file_proto)
+                pool.FindServiceByName(self.service)
+                return pool
+            except Exception as e:
+                logger.warning(f"Ignoring unusable descriptor cache {self.descriptor_cache_path}: {str(e)}")
+
+        return self._reflect_descriptor_pool()
+
+    def _reflect_descriptor_pool(self):
+        from google.protobuf import descriptor_pool
+        from grpc_reflection.v1alpha.proto_reflection_descriptor_database import (
+            ProtoReflectionDescriptorDatabase,
+        )
+
+        logger.info(f"Fetching descriptors for {self.service} via reflection")
+        reflection_db = ProtoReflectionDescriptorDatabase(self.channel)
+        pool = descriptor_pool.DescriptorPool(reflection_db)
+        service_desc = pool.FindServiceByName(self.service)
+
+        if self.descriptor_cache_path:
+            write_descriptor_cache(self.descriptor_cache_path, service_desc)
+            logger.info(f"Cached feature platform descriptors to {self.descriptor_cache_path}")
+
+        return pool
+
+    def _get_method(self, service: str, method: str) -> Tuple:
+        key = (service, method)
+        if key not in self._methods:
+            from google.protobuf import message_factory
+
+            method_desc = self.pool.FindServiceByName(service).FindMethodByName(method)
+            request_cls = message_factory.GetMessageClass(method_desc.input_type)
+            response_cls = message_factory.GetMessageClass(method_desc.output_type)
+            stub = self.channel.unary_unary(
+                f"/{service}/{method}",
+                request_serializer=request_cls.SerializeToString,
+                response_deserializer=response_cls.FromString,
+            )
+            self._methods[key] = (request_cls, stub)
+        return self._methods[key]
+
+    def request(
+        self,
+        service: str,
+        method: str,
+        request: Dict,
+        metadata: Optional[List[Tuple[str, str]]] = None,
+    ) -> Dict:
+        """Send a unary request and return the response as a dict"""
+        from google.protobuf import json_format
+
+        request_cls, stub = self._get_method(service, method)
+        message = json_format.ParseDict(request, request_cls())
+        response = stub(message, metadata=metadata)
+        return json_format.MessageToDict(response, preserving_proto_field_name=True)
+
+
+def descriptor_cache_path(cache_dir: str, endpoint: str, service: str) -> str:
+    """Cache file for the descriptors of a service at an endpoint"""
+    key = re.sub(r"[^\w.-]", "_", f"{endpoint}__{service}")
+    return os.path.join(cache_dir, f"{key}.pb")
+
+
+def write_descriptor_cache(path: str, service_desc) -> None:
+    """
+    Serialize the files defining a service, dependencies first, to `path`
+
+    The file is written to a temporary file in the same directory and moved
+    over `path`, so workers starting together with a cold cache never read a
+    partially written file.
+    """
+    from google.protobuf import descriptor_pb2
+
+    file_set = descriptor_pb2.FileDescriptorSet()
+    for file_desc in _files_in_dependency_order(service_desc.file):
+        file_desc.CopyToProto(file_set.file.add())
+
+    cache_dir = os.path.dirname(path) or "."
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=cache_dir, prefix=".descriptors-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(file_set.SerializeToString())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _files_in_dependency_order(file_desc) -> List:
+    ordered = []
+    seen = set()
+
+    def visit(fd):
+        if fd.name in seen:
+            return
+        seen.add(fd.name)
+        for dep in fd.dependencies:
+            visit(dep)
+        ordered.append(fd)
+
+    visit(file_desc)
+    return ordered
@@ -0,0 +1,64 @@
+import math
+
+import pytest
+
+from evaluator.cost import (
+    BudgetExceededError,
+    UsageTracker,
+    allocate_budget,
+    allocate_union_budget,
+    estimate_cost,
+)
+
+
+def test_reservations_cap_in_flight_spend():
+    tracker = UsageTracker(model="gpt-4o-mini", combo="c", budget_usd=1.0)
+    per_call = estimate_cost(1_000_000, 0, "gpt-4o-mini")  # $0.15
+
+    reservations = [tracker.reserve(1_000_000, 0) for _ in range(6)]
+    with pytest.raises(BudgetExceededError):
+        tracker.reserve(1_000_000, 0)
+    assert tracker.exhausted
+
+    for reserved in reservations:
+        tracker.settle(reserved, "kw", 1_000_000, 0)
+    assert tracker.total_cost == pytest.approx(6 * per_call)
+    assert tracker.total_cost <= tracker.budget_usd
+
+
+def test_release_frees_reservation():
+    tracker = UsageTracker(model="gpt-4o-mini", combo="c", budget_usd=0.2)
+    reserved = tracker.reserve(1_000_000, 0)
+    tracker.release(reserved)
+    tracker.reserve(1_000_000, 0)
+
+
+def test_unknown_model_records_tokens_without_budget():
+    tracker = UsageTracker(model="unpriced-model", combo="c")
+    tracker.record("kw", 100, 5)
+
+    summary = tracker.summary()
+    assert summary["llm_prompt_tokens"] == 100
+    assert summary["llm_completion_tokens"] == 5
+    assert math.isnan(summary["llm_cost_usd"])
+    assert not tracker.exhausted
+
+
+def test_unknown_model_with_budget_is_rejected():
+    with pytest.raises(ValueError):
+        UsageTracker(model="unpriced-model", combo="c", budget_usd=1.0)
+
+
+def test_allocate_budget_shrinks_ranks_before_keywords():
+    assert allocate_budget(100, 0.01, 10, 100, 20) == {"num_keywords": 10, "ranks_per_keyword": 100}
+    assert allocate_budget(5, 0.01, 10, 100, 20) == {"num_keywords": 10, "ranks_per_keyword": 50}
+    assert allocate_budget(1, 0.01, 10, 100, 20) == {"num_keywords": 5, "ranks_per_keyword": 20}
+
+
+def test_allocate_union_budget_shrinks_depth_before_keywords():
+    # Best rank across combos of each distinct ad, for two keywords
+    first_ranks = [[1, 1, 2, 3, 4], [1, 2, 2, 3, 4]]
+
+    assert allocate_union_budget(10, 1, first_ranks, 4, 2) == {"num_keywords": 2, "ranks_per_keyword": 4}
+    assert allocate_union_budget(8, 1, first_ranks, 4, 2) == {"num_keywords": 2, "ranks_per_keyword": 3}
+    assert allocate_union_budget(3, 1, first_ranks, 4, 2) == {"num_keywords": 1, "ranks_per_keyword": 2}
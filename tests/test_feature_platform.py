@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+pytest.importorskip("grpc")
+descriptor_pb2 = pytest.importorskip("google.protobuf.descriptor_pb2")
+
+from google.protobuf import descriptor_pool, json_format  # noqa: E402
+
+from search.feature_platform import (  # noqa: E402
+    FeaturePlatformClient,
+    descriptor_cache_path,
+    write_descriptor_cache,
+)
+
+SERVICE = "test.rpc.v1.KeywordService"
+
+
+def build_service_pool():
+    """Pool with a service whose request type lives in a dependency file"""
+    common = descriptor_pb2.FileDescriptorProto(name="test/common.proto", package="test.common", syntax="proto3")
+    keyword = common.message_type.add(name="Keyword")
+    keyword.field.add(
+        name="text",
+        number=1,
+        type=descriptor_pb2.FieldDescriptorProto.TYPE_STRING,
+        label=descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL,
+    )
+
+    service = descriptor_pb2.FileDescriptorProto(
+        name="test/service.proto",
+        package="test.rpc.v1",
+        syntax="proto3",
+        dependency=["test/common.proto"],
+    )
+    response = service.message_type.add(name="WeightsResponse")
+    response.field.add(
+        name="category_weights",
+        number=1,
+        type=descriptor_pb2.FieldDescriptorProto.TYPE_STRING,
+        label=descriptor_pb2.FieldDescriptorProto.LABEL_OPTIONAL,
+    )
+    service.service.add(name="KeywordService").method.add(
+        name="GetWeights",
+        input_type=".test.common.Keyword",
+        output_type=".test.rpc.v1.WeightsResponse",
+    )
+
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(common)
+    pool.Add(service)
+    return pool
+
+
+def test_descriptor_cache_round_trip(tmp_path, monkeypatch):
+    path = descriptor_cache_path(str(tmp_path / "cache"), "localhost:50051", SERVICE)
+    write_descriptor_cache(path, build_service_pool().FindServiceByName(SERVICE))
+    assert os.listdir(tmp_path / "cache") == [os.path.basename(path)]
+
+    def reflect(self):
+        raise AssertionError("descriptors should come from the cache")
+
+    monkeypatch.setattr(FeaturePlatformClient, "_reflect_descriptor_pool", reflect)
+    client = FeaturePlatformClient("localhost:50051", SERVICE, descriptor_cache_dir=str(tmp_path / "cache"))
+
+    request_cls, _ = client._get_method(SERVICE, "GetWeights")
+    message = json_format.ParseDict({"text": "냉장고"}, request_cls())
+    assert request_cls.FromString(message.SerializeToString()).text == "냉장고"
+
+
+def test_refresh_bypasses_cache(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path)
+    write_descriptor_cache(
+        descriptor_cache_path(cache_dir, "localhost:50051", SERVICE),
+        build_service_pool().FindServiceByName(SERVICE),
+    )
+    monkeypatch.setattr(FeaturePlatformClient, "_reflect_descriptor_pool", lambda self: "reflected")
+
+    client = FeaturePlatformClient(
+        "localhost:50051", SERVICE, descriptor_cache_dir=cache_dir, refresh_descriptors=True
+    )
+    assert client.pool == "reflected"
+
+
+def test_descriptor_cache_path_is_keyed_on_endpoint_and_service(tmp_path):
+    path = descriptor_cache_path(str(tmp_path), "feature-platform:80", SERVICE)
+    assert os.path.dirname(path) == str(tmp_path)
+    assert ":" not in os.path.basename(path)
+    assert path == descriptor_cache_path(str(tmp_path), "feature-platform:80", SERVICE)
+    assert path != descriptor_cache_path(str(tmp_path), "feature-platform-staging:80", SERVICE)
+    assert path != descriptor_cache_path(str(tmp_path), "feature-platform:80", "test.rpc.v1.OtherService")
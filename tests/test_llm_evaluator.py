@@ -0,0 +1,84 @@
+import json
+import os
+import re
+
+import pandas as pd
+import pytest
+
+from evaluator.llm_evaluator import FULL_RESPONSE_SCHEMA, LABEL_RESPONSE_SCHEMA, parse_llm_response
+from evaluator.metrics import calculate_metrics
+
+
+@pytest.mark.parametrize(
+    "content, score",
+    [
+        ('{"Score": 1}', 1),
+        ('{"Query": "냉장고", "Score": "0"}', 0),
+        ('```json\n{"Score": "1"}\n```', 1),
+        ('Output: {"Core_intent": "냉장고", "Score": 0} done', 0),
+        ('{"Query": "냉장고", "Core_intent": "냉장고", "Score": "1"', 1),
+    ],
+)
+def test_parse_llm_response_recovers_score(content, score):
+    assert parse_llm_response(content)["Score"] == score
+
+
+@pytest.mark.parametrize(
+    "content",
+    ['{"Score": 10}', '{"Score": "2"}', '{"Score": true}', '{"Score": "12', "no json here", ""],
+)
+def test_parse_llm_response_rejects_invalid_scores(content):
+    with pytest.raises(ValueError):
+        parse_llm_response(content)
+
+
+def test_calculate_metrics_excludes_parse_failures():
+    df = pd.DataFrame(
+        {
+            "keyword": ["a", "a", "a", "a"],
+            "label": [1, 0, None, 1],
+            "num_results": [4, 4, 4, 4],
+            "parse_failed": [False, False, True, False],
+        }
+    )
+
+    metrics = calculate_metrics(df)
+
+    assert metrics["parse_failure_rate"] == 0.25
+    assert metrics["avg_precision"] == pytest.approx(2 / 3)
+
+
+def test_calculate_metrics_usage_includes_parse_failures():
+    df = pd.DataFrame(
+        {
+            "keyword": ["a", "a", "a", "a"],
+            "label": [1, 0, None, 1],
+            "num_results": [4, 4, 4, 4],
+            "completion_tokens": [40, 40, 120, 40],
+            "latency_ms": [100.0, 100.0, 500.0, 100.0],
+            "parse_failed": [False, False, True, False],
+        }
+    )
+
+    metrics = calculate_metrics(df)
+
+    assert metrics["avg_completion_tokens"] == 60
+    assert metrics["avg_llm_latency_ms"] == 200
+
+
+@pytest.mark.parametrize(
+    "prompt_path, schema",
+    [("prompts/v1_structured.txt", FULL_RESPONSE_SCHEMA), ("prompts/v1_label.txt", LABEL_RESPONSE_SCHEMA)],
+)
+def test_prompt_examples_match_response_schema(prompt_path, schema):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    with open(os.path.join(root, prompt_path)) as f:
+        prompt = f.read()
+    examples = [json.loads(m) for m in re.findall(r"Output:\s*(\{.*?\})", prompt, re.DOTALL)]
+    types = {"string": str, "integer": int}
+
+    assert examples
+    for example in examples:
+        assert sorted(example) == sorted(schema["schema"]["required"])
+        for field, spec in schema["schema"]["properties"].items():
+            assert type(example[field]) is types[spec["type"]]
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from evaluator.overlap import overlap_matrices, summarize_overlap
+
+
+@pytest.mark.parametrize("length", [1, 5, 30, 100])
+def test_identical_lists_score_one_at_any_length(length):
+    ids = [f"ad{i}" for i in range(length)]
+    rbo, jaccard = overlap_matrices([ids, list(ids)], k=100, p=0.98)
+
+    assert rbo[0, 1] == pytest.approx(1.0)
+    assert jaccard[0, 1] == pytest.approx(1.0)
+
+
+def test_disjoint_lists_score_zero():
+    rbo, jaccard = overlap_matrices([["a", "b", "c"], ["d", "e", "f"]], k=100, p=0.98)
+
+    assert rbo[0, 1] == 0.0
+    assert jaccard[0, 1] == 0.0
+
+
+def test_one_empty_list_scores_zero_and_two_empty_score_one():
+    rbo, jaccard = overlap_matrices([["a", "b"], [], []], k=100, p=0.98)
+
+    assert rbo[0, 1] == 0.0
+    assert jaccard[0, 1] == 0.0
+    assert rbo[1, 2] == 1.0
+    assert jaccard[1, 2] == 1.0
+
+
+def test_swapped_top_ranks_lower_rbo_but_not_jaccard():
+    a = [str(i) for i in range(10)]
+    b = [a[1], a[0]] + a[2:]
+    rbo, jaccard = overlap_matrices([a, b], k=10, p=0.9)
+
+    assert rbo[0, 1] == pytest.approx(0.9)
+    assert jaccard[0, 1] == 1.0
+
+
+def test_matrices_are_symmetric():
+    lists = [["a", "b", "c"], ["c", "a"], ["x", "a", "b", "c"]]
+    rbo, jaccard = overlap_matrices(lists, k=3)
+
+    np.testing.assert_allclose(rbo, rbo.T)
+    np.testing.assert_allclose(jaccard, jaccard.T)
+
+
+def test_indistinguishable_flag_needs_enough_keywords():
+    identical = overlap_matrices([["a", "b"], ["a", "b"]], k=10)
+    combos = ["x", "y"]
+
+    _, _, pairs = summarize_overlap({"k1": identical}, combos, threshold=0.9, min_keywords=3)
+    assert np.isnan(pairs.loc[0, "indistinguishable"])
+
+    per_keyword = {f"k{i}": identical for i in range(3)}
+    _, _, pairs = summarize_overlap(per_keyword, combos, threshold=0.9, min_keywords=3)
+    assert pairs.loc[0, "indistinguishable"]
+
+
+def test_short_prefix_of_long_list_is_not_flagged():
+    ids = [f"ad{i}" for i in range(100)]
+    prefix = overlap_matrices([ids[:3], ids], k=100, p=0.98)
+
+    assert prefix[0][0, 1] < 0.5
+    assert prefix[1][0, 1] == pytest.approx(0.03)
+
+    per_keyword = {f"k{i}": prefix for i in range(6)}
+    _, _, pairs = summarize_overlap(per_keyword, ["strict", "loose"], threshold=0.9)
+    assert not pairs.loc[0, "indistinguishable"]
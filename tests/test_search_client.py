@@ -0,0 +1,100 @@
+import pytest
+
+from search.client import SearchClient, _accumulate_profile, _count_terms, _percentile
+
+DSL_PARAMS = {
+    "fasttext_category_list": ["냉장고"],
+    "category_1_weights": {1: 3, 2: 2},
+    "category_2_weights": {10: 3, 11: 1},
+    "category_3_weights": {100: 2},
+}
+
+
+def test_percentile_interpolates_between_ranks():
+    values = [40, 10, 30, 20]
+
+    assert _percentile(values, 0) == 10
+    assert _percentile(values, 50) == 25
+    assert _percentile(values, 100) == 40
+    assert _percentile(values, 90) == pytest.approx(37)
+    assert _percentile([], 99) == 0.0
+
+
+def test_count_terms_sums_values_of_terms_clauses():
+    fragment = {
+        "bool": {
+            "filter": [
+                {"term": {"is_live": {"value": True}}},
+                {"terms": {"llm_category_depth_2_id": [10, 11, -1]}},
+                {
+                    "bool": {
+                        "should": [
+                            {"terms": {"fast_text_category_name": ["냉장고", "김치냉장고"]}},
+                            {"bool": {"must_not": {"exists": {"field": "fast_text_category_name"}}}},
+                        ]
+                    }
+                },
+            ]
+        }
+    }
+
+    assert _count_terms(fragment) == 5
+
+
+def test_accumulate_profile_sums_clause_time_over_shards():
+    def shard(bool_nanos, terms_nanos):
+        return {
+            "searches": [
+                {
+                    "query": [
+                        {
+                            "type": "FunctionScoreQuery",
+                            "time_in_nanos": bool_nanos + terms_nanos,
+                            "children": [
+                                {"type": "BooleanQuery", "time_in_nanos": bool_nanos},
+                                {"type": "TermInSetQuery", "time_in_nanos": terms_nanos},
+                            ],
+                        }
+                    ]
+                }
+            ]
+        }
+
+    clause_nanos = {"FunctionScoreQuery": 100}
+    _accumulate_profile({"shards": [shard(1_000, 500), shard(2_000, 1_500)]}, clause_nanos)
+
+    assert clause_nanos == {
+        "FunctionScoreQuery": 5_100,
+        "FunctionScoreQuery/BooleanQuery": 3_000,
+        "FunctionScoreQuery/TermInSetQuery": 2_000,
+    }
+
+
+def test_benchmark_times_requests_without_profiling(monkeypatch):
+    client = SearchClient("http://localhost:9200", "index", feature_platform_config={})
+    sent = []
+
+    def execute(dsl, session=None):
+        sent.append(dsl)
+        if not dsl.get("profile"):
+            return {"took": 5}
+        query = {"type": "BooleanQuery", "time_in_nanos": 2_000_000}
+        return {"took": 50, "profile": {"shards": [{"searches": [{"query": [query]}]}]}}
+
+    monkeypatch.setattr(client, "_execute", execute)
+    report = client.benchmark(
+        keywords=["냉장고", "운동화"],
+        dsl_filter="llm_depth2",
+        dsl_ranking="llm_depth23_score12",
+        concurrency=2,
+        warmup=1,
+        repeat=2,
+        profile=True,
+        dsl_params={"냉장고": DSL_PARAMS, "운동화": DSL_PARAMS},
+    )
+
+    assert report["num_requests"] == 4
+    assert report["took_p99_ms"] == 5
+    assert report["avg_filter_terms"] == 3
+    assert report["profile_ms"] == {"BooleanQuery": pytest.approx(2.0)}
+    assert sum(1 for dsl in sent if dsl.get("profile")) == 2